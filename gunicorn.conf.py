@@ -0,0 +1,18 @@
+"""Gunicorn settings for serving wsgi:app in production"""
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8580")
+# gthread workers: threads keep requests non-blocking, and each worker holds its own
+# DNS pool and export indexes, so one worker per core is enough
+workers = int(os.environ.get("WEB_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = 4
+# Combined Excel creation can take a while on large exports
+timeout = 120
+
+
+def worker_exit(server, worker):
+    """Stop this worker's scrape processes (and their Chrome) before it exits"""
+    from main import stop_scrape_processes
+    stop_scrape_processes()
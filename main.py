@@ -5,19 +5,29 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from bs4 import BeautifulSoup
-import re, time, requests, subprocess
+import re, time, requests, subprocess, sys, signal, uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import fcntl
+import multiprocessing
+import sqlite3
 import json
 import os
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 from datetime import datetime
 import hashlib
+import ipaddress
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import dns.resolver
+import dns.exception
 
 app = Flask(__name__)
 
-# JSON database file
+# Old JSON database file; shown businesses are now kept in the job store (see get_jobs_db)
 DB_FILE = "database.json"
 
 def load_db():
@@ -27,11 +37,6 @@ def load_db():
             return json.load(f)
     return {}
 
-def save_db(data):
-    """Save database to JSON file"""
-    with open(DB_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
-
 def get_excel_filename(query):
     """Generate Excel filename from query"""
     # Clean query to make it safe for filename
@@ -48,6 +53,32 @@ def save_to_excel(query, results):
     
     filename = get_excel_filename(query)
     
+    # Concurrent scrapes of the same query must not overwrite each other's rows
+    with export_write_lock(filename):
+        return append_results_to_excel(filename, results)
+
+@contextmanager
+def export_write_lock(filename):
+    """Hold an exclusive lock on an export, across threads and processes"""
+    with open(filename + ".lock", 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def save_workbook_atomic(wb, filename):
+    """Save a workbook via a temp file so readers never see a half-written file"""
+    tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        wb.save(tmp_filename)
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+def append_results_to_excel(filename, results):
+    """Append results to an export, creating it if needed (caller holds the export's lock)"""
     # Check if file exists
     if os.path.exists(filename):
         # Load existing workbook
@@ -59,6 +90,13 @@ def save_to_excel(query, results):
         last_sr_no = ws.cell(ws.max_row, 1).value if ws.max_row > 1 else 0
         if not isinstance(last_sr_no, int):
             last_sr_no = 0
+        # Files created before email verification have no status column yet
+        if ws.cell(1, 8).value is None:
+            cell = ws.cell(1, 8, "Email Status")
+            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            cell.font = Font(bold=True, color="FFFFFF", size=12)
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            ws.column_dimensions['H'].width = 30
     else:
         # Create new workbook
         wb = Workbook()
@@ -66,7 +104,7 @@ def save_to_excel(query, results):
         ws.title = "Results"
         
         # Create header row with styling
-        headers = ["Sr No", "Name", "Address", "Phone", "Website", "Emails", "Date Added"]
+        headers = ["Sr No", "Name", "Address", "Phone", "Website", "Emails", "Date Added", "Email Status"]
         header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
         header_font = Font(bold=True, color="FFFFFF", size=12)
         
@@ -84,6 +122,7 @@ def save_to_excel(query, results):
         ws.column_dimensions['E'].width = 40
         ws.column_dimensions['F'].width = 40
         ws.column_dimensions['G'].width = 20
+        ws.column_dimensions['H'].width = 30
         
         next_row = 2
         last_sr_no = 0
@@ -118,24 +157,178 @@ def save_to_excel(query, results):
         ws.cell(next_row, 5, result['website'] if result['website'] else "N/A")
         ws.cell(next_row, 6, ", ".join(result['emails']) if result['emails'] else "N/A")
         ws.cell(next_row, 7, current_date)
+        email_status = result.get('email_status', {})
+        ws.cell(next_row, 8, ", ".join(email_status.get(e, "unchecked") for e in result['emails']) if result['emails'] else "N/A")
         
         # Apply alignment
-        for col in range(1, 8):
+        for col in range(1, 9):
             ws.cell(next_row, col).alignment = Alignment(vertical="top", wrap_text=True)
         
         next_row += 1
     
     # Save the workbook
-    wb.save(filename)
+    save_workbook_atomic(wb, filename)
     return filename
 
-# Global variable to track progress
-progress_data = {"current": 0, "total": 0, "status": "idle"}
-progress_lock = threading.Lock()
+# Shared job store: per-job progress, stop flag and live results, plus the businesses
+# already shown per query. Kept in SQLite so web workers and scraper processes all see the same state.
+JOBS_DB = "jobs.db"
+
+# "thread" runs scrapes inside the web process (dev server),
+# "process" runs each scrape in its own worker process (see wsgi.py)
+JOB_RUNNER = os.environ.get("JOB_RUNNER", "thread")
+
+# Each scrape drives its own Chrome, so limit how many run at once across all workers
+MAX_SCRAPE_JOBS = int(os.environ.get("MAX_SCRAPE_JOBS", 2))
+
+# Finished jobs (and their results) are removed after this many seconds
+JOB_RETENTION = 24 * 60 * 60
+
+jobs_db_ready = False
+
+def get_jobs_db():
+    """Open a connection to the shared job store, creating its tables if needed"""
+    global jobs_db_ready
+    conn = sqlite3.connect(JOBS_DB, timeout=10, isolation_level=None)
+    if not jobs_db_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY, pid INTEGER, progress TEXT,
+            stop INTEGER DEFAULT 0, finished INTEGER DEFAULT 0, created REAL)""")
+        conn.execute("CREATE TABLE IF NOT EXISTS job_results (id INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT, data TEXT)")
+        conn.execute("CREATE INDEX IF NOT EXISTS job_results_job_id ON job_results (job_id)")
+        conn.execute("CREATE TABLE IF NOT EXISTS shown_businesses (query TEXT, business_id TEXT, PRIMARY KEY (query, business_id))")
+        import_shown_businesses(conn)
+        jobs_db_ready = True
+    return conn
+
+def import_shown_businesses(conn):
+    """Copy shown businesses from the old JSON database into the job store (once)"""
+    if conn.execute("SELECT 1 FROM shown_businesses LIMIT 1").fetchone() or not os.path.exists(DB_FILE):
+        return
+    try:
+        db = load_db()
+    except Exception as e:
+        print(f"Could not import {DB_FILE}: {e}")
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany(
+        "INSERT OR IGNORE INTO shown_businesses (query, business_id) VALUES (?, ?)",
+        [(key[len("shown_"):], business_id) for key, ids in db.items() if key.startswith("shown_") for business_id in ids]
+    )
+    conn.execute("COMMIT")
+
+def is_process_alive(pid):
+    """Check whether a process with this pid is still running"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def create_job(limit):
+    """Register a new scrape job and return its id, or None if too many are running"""
+    conn = get_jobs_db()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM job_results WHERE job_id IN (SELECT id FROM jobs WHERE finished = 1 AND created < ?)",
+                     (time.time() - JOB_RETENTION,))
+        conn.execute("DELETE FROM jobs WHERE finished = 1 AND created < ?", (time.time() - JOB_RETENTION,))
+
+        # Jobs whose process died without finishing no longer count
+        running = 0
+        for job_id, pid in conn.execute("SELECT id, pid FROM jobs WHERE finished = 0").fetchall():
+            if pid and is_process_alive(pid):
+                running += 1
+            else:
+                conn.execute("UPDATE jobs SET finished = 1 WHERE id = ?", (job_id,))
+        if running >= MAX_SCRAPE_JOBS:
+            conn.execute("COMMIT")
+            return None
+
+        job_id = uuid.uuid4().hex
+        progress = {"current": 0, "total": limit, "status": "Starting search..."}
+        conn.execute("INSERT INTO jobs (id, pid, progress, created) VALUES (?, ?, ?, ?)",
+                     (job_id, os.getpid(), json.dumps(progress), time.time()))
+        conn.execute("COMMIT")
+        return job_id
+    finally:
+        conn.close()
+
+def set_job_pid(job_id, pid):
+    """Record the process running a job"""
+    conn = get_jobs_db()
+    try:
+        conn.execute("UPDATE jobs SET pid = ? WHERE id = ?", (pid, job_id))
+    finally:
+        conn.close()
 
-# Global stop flag
-stop_scraping = False
-stop_lock = threading.Lock()
+def finish_job(job_id):
+    """Mark a job as no longer running"""
+    conn = get_jobs_db()
+    try:
+        conn.execute("UPDATE jobs SET finished = 1 WHERE id = ?", (job_id,))
+    finally:
+        conn.close()
+
+def read_progress(job_id):
+    """Return a job's progress dict, or None if the job does not exist"""
+    conn = get_jobs_db()
+    try:
+        row = conn.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    finally:
+        conn.close()
+
+def update_progress(job_id, **fields):
+    """Update fields of a job's progress dict"""
+    conn = get_jobs_db()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row:
+            progress = json.loads(row[0])
+            progress.update(fields)
+            conn.execute("UPDATE jobs SET progress = ? WHERE id = ?", (json.dumps(progress), job_id))
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+def request_stop(job_id):
+    """Ask a running scrape to stop; returns False if the job does not exist"""
+    conn = get_jobs_db()
+    try:
+        return conn.execute("UPDATE jobs SET stop = 1 WHERE id = ?", (job_id,)).rowcount > 0
+    finally:
+        conn.close()
+
+def is_stop_requested(job_id):
+    """Check whether a running scrape has been asked to stop"""
+    conn = get_jobs_db()
+    try:
+        row = conn.execute("SELECT stop FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+    finally:
+        conn.close()
+
+def add_result(job_id, result):
+    """Publish a result so /results can show it while the scrape is running"""
+    conn = get_jobs_db()
+    try:
+        conn.execute("INSERT INTO job_results (job_id, data) VALUES (?, ?)", (job_id, json.dumps(result)))
+    finally:
+        conn.close()
+
+def read_results(job_id):
+    """Return all results published for a job"""
+    conn = get_jobs_db()
+    try:
+        rows = conn.execute("SELECT data FROM job_results WHERE job_id = ? ORDER BY id", (job_id,))
+        return [json.loads(row[0]) for row in rows]
+    finally:
+        conn.close()
 
 def get_chrome_driver():
     """Create and return a configured Chrome driver instance"""
@@ -171,25 +364,21 @@ def get_chrome_driver():
 
 def is_business_already_shown(business_id, query):
     """Check if a business has already been shown for this query"""
-    db = load_db()
-    db_key = f"shown_{query}"
-    if db_key in db:
-        shown_businesses = db[db_key]
-        return business_id in shown_businesses
-    return False
+    conn = get_jobs_db()
+    try:
+        row = conn.execute("SELECT 1 FROM shown_businesses WHERE query = ? AND business_id = ?",
+                           (query, business_id)).fetchone()
+        return row is not None
+    finally:
+        conn.close()
 
 def mark_business_as_shown(business_id, query):
     """Mark a business as shown for this query"""
-    db = load_db()
-    db_key = f"shown_{query}"
-    if db_key in db:
-        shown_businesses = db[db_key]
-        if business_id not in shown_businesses:
-            shown_businesses.append(business_id)
-            db[db_key] = shown_businesses
-    else:
-        db[db_key] = [business_id]
-    save_db(db)
+    conn = get_jobs_db()
+    try:
+        conn.execute("INSERT OR IGNORE INTO shown_businesses (query, business_id) VALUES (?, ?)", (query, business_id))
+    finally:
+        conn.close()
 
 def fetch_emails_from_website(website):
     """Fetch emails from a website with retry limit"""
@@ -229,6 +418,122 @@ def verify_email(email):
     email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(email_pattern, email) is not None
 
+# DNS verification settings
+DNS_TIMEOUT = 2.0
+DNS_MAX_WORKERS = 32
+DNS_CACHE_SIZE = 10000
+
+def parse_nameserver(value):
+    """Parse "ip", "ip:port" or "[ipv6]:port" into (ip, port), raising ValueError if invalid"""
+    host, port = value, "53"
+    if value.startswith("["):
+        host, sep, rest = value[1:].partition("]")
+        if not sep or (rest and not rest.startswith(":")):
+            raise ValueError(f"Invalid DNS_NAMESERVER: {value!r}")
+        if rest:
+            port = rest[1:]
+    elif value.count(":") == 1:
+        host, port = value.split(":")
+
+    try:
+        ipaddress.ip_address(host)
+        port = int(port)
+    except ValueError:
+        raise ValueError(f"DNS_NAMESERVER must be an IP address with an optional port (e.g. 127.0.0.1:5353 or [::1]:5353), got {value!r}")
+    if not 0 < port < 65536:
+        raise ValueError(f"Invalid DNS_NAMESERVER port: {value!r}")
+    return host, port
+
+# Set DNS_NAMESERVER to "ip[:port]" (e.g. "127.0.0.1:5353") to use a local stub resolver
+DNS_NAMESERVER = parse_nameserver(os.environ["DNS_NAMESERVER"]) if os.environ.get("DNS_NAMESERVER") else None
+
+# Cache of domain -> Future resolving to a verification status, oldest first
+# Statuses: "mx", "a_only" (no MX, but an A/AAAA record accepts mail), "no_mail", "unknown"
+dns_cache = OrderedDict()
+dns_cache_lock = threading.Lock()
+dns_executor = ThreadPoolExecutor(max_workers=DNS_MAX_WORKERS)
+dns_resolver = None
+
+def get_dns_resolver():
+    """Create (once) and return the shared DNS resolver"""
+    global dns_resolver
+    with dns_cache_lock:
+        if dns_resolver is None:
+            if DNS_NAMESERVER:
+                resolver = dns.resolver.Resolver(configure=False)
+                resolver.nameservers = [DNS_NAMESERVER[0]]
+                resolver.port = DNS_NAMESERVER[1]
+            else:
+                resolver = dns.resolver.Resolver()
+            resolver.timeout = DNS_TIMEOUT
+            resolver.lifetime = DNS_TIMEOUT
+            dns_resolver = resolver
+        return dns_resolver
+
+def lookup_mail_domain(domain):
+    """Resolve MX records for a domain (falling back to A/AAAA) and return its status"""
+    resolver = get_dns_resolver()
+    try:
+        answer = resolver.resolve(domain, "MX")
+        # A lone "0 ." record is a null MX: the domain explicitly accepts no mail
+        if all(str(record.exchange) == "." for record in answer):
+            return "no_mail"
+        return "mx"
+    except dns.resolver.NXDOMAIN:
+        return "no_mail"
+    except dns.resolver.NoAnswer:
+        pass
+    except dns.exception.DNSException:
+        return "unknown"
+
+    # No MX: the domain's own address is the implicit mail server (RFC 5321)
+    for rdtype in ("A", "AAAA"):
+        try:
+            resolver.resolve(domain, rdtype)
+            return "a_only"
+        except dns.resolver.NXDOMAIN:
+            return "no_mail"
+        except dns.resolver.NoAnswer:
+            continue
+        except dns.exception.DNSException:
+            return "unknown"
+    return "no_mail"
+
+def prefetch_domain(domain):
+    """Start resolving a domain in the background and return its cached future"""
+    domain = domain.lower().rstrip(".")
+    with dns_cache_lock:
+        future = dns_cache.get(domain)
+        # Failed lookups ("unknown") are retried rather than cached
+        if future is not None and future.done() and (future.exception() or future.result() == "unknown"):
+            future = None
+        if future is None:
+            future = dns_executor.submit(lookup_mail_domain, domain)
+            dns_cache[domain] = future
+            if len(dns_cache) > DNS_CACHE_SIZE:
+                dns_cache.popitem(last=False)
+        else:
+            dns_cache.move_to_end(domain)
+    return future
+
+def prefetch_website_domain(website):
+    """Pre-resolve a website's domain so checks on emails at that domain hit the cache"""
+    hostname = urlparse(website).hostname
+    if not hostname:
+        return
+    if hostname.startswith("www."):
+        hostname = hostname[4:]
+    prefetch_domain(hostname)
+
+def verify_email_domain(email):
+    """Return the verification status of an email's domain (MX/A lookup)"""
+    future = prefetch_domain(email.split('@')[1])
+    try:
+        # A lookup runs up to three queries (MX, then A, then AAAA), each bounded by DNS_TIMEOUT
+        return future.result(timeout=DNS_TIMEOUT * 3 + 1)
+    except Exception:
+        return "unknown"
+
 def process_single_card(driver, card, idx):
     """Process a single Google Maps card"""
     try:
@@ -292,14 +597,8 @@ def process_single_card(driver, card, idx):
         print(f"Error processing card {idx}: {e}")
         return None
 
-def scrape_google_maps(query, limit=10):
-    global progress_data, stop_scraping
-    
-    with stop_lock:
-        stop_scraping = False
-    
-    with progress_lock:
-        progress_data = {"current": 0, "total": limit, "status": "Initializing..."}
+def scrape_google_maps(job_id, query, limit=10, verify_mx=False):
+    update_progress(job_id, status="Initializing...")
     
     seen_businesses = set()
     results_with_emails = []
@@ -307,8 +606,7 @@ def scrape_google_maps(query, limit=10):
     driver = get_chrome_driver()
     
     try:
-        with progress_lock:
-            progress_data["status"] = "Loading Google Maps..."
+        update_progress(job_id, status="Loading Google Maps...")
         
         driver.get(f"https://www.google.com/maps/search/{query.replace(' ', '+')}/")
         time.sleep(3)
@@ -322,9 +620,8 @@ def scrape_google_maps(query, limit=10):
         max_empty_batches = 5  # Stop if we get 5 consecutive empty batches
         
         while len(results_with_emails) < limit and scroll_count < max_scrolls and consecutive_empty_batches < max_empty_batches:
-            with stop_lock:
-                if stop_scraping:
-                    break
+            if is_stop_requested(job_id):
+                break
             
             # Scroll to get more cards - use JavaScript scroll with fallback
             retry_count = 0
@@ -376,8 +673,7 @@ def scrape_google_maps(query, limit=10):
             else:
                 consecutive_empty_batches = 0  # Reset counter when we find new cards
             
-            with progress_lock:
-                progress_data["status"] = f"Processing batch of {len(batch_urls)} businesses..."
+            update_progress(job_id, status=f"Processing batch of {len(batch_urls)} businesses...")
             
             # Process batch: extract website info
             batch_with_websites = []
@@ -385,9 +681,8 @@ def scrape_google_maps(query, limit=10):
                 if len(results_with_emails) >= limit:
                     break
                 
-                with stop_lock:
-                    if stop_scraping:
-                        break
+                if is_stop_requested(job_id):
+                    break
                 
                 try:
                     driver.get(card_url)
@@ -435,6 +730,9 @@ def scrape_google_maps(query, limit=10):
                             pass
                     
                     if website and "google.com" not in website:
+                        if verify_mx:
+                            prefetch_website_domain(website)
+                        
                         business_id = f"{name}|{address}"
                         
                         if business_id not in seen_businesses and not is_business_already_shown(business_id, query):
@@ -451,8 +749,7 @@ def scrape_google_maps(query, limit=10):
                     print(f"Error processing card: {e}")
             
             # Extract emails from batch websites
-            with progress_lock:
-                progress_data["status"] = f"Extracting emails from {len(batch_with_websites)} websites..."
+            update_progress(job_id, status=f"Extracting emails from {len(batch_with_websites)} websites...")
             
             def extract_and_verify(business_data):
                 """Extract and verify emails for a business"""
@@ -460,31 +757,37 @@ def scrape_google_maps(query, limit=10):
                 if emails:
                     print(f"✉️  Found {len(emails)} emails from {business_data['name'][:30]}: {emails}")
                     verified = []
+                    statuses = {}
                     for email in emails:
-                        if verify_email(email):
-                            verified.append(email)
-                            print(f"✅ VERIFIED: {email}")
-                        else:
+                        if not verify_email(email):
                             print(f"❌ Invalid: {email}")
-                    return (business_data, verified)
+                            continue
+                        status = verify_email_domain(email) if verify_mx else "unchecked"
+                        if status == "no_mail":
+                            print(f"❌ No mail server: {email}")
+                            continue
+                        verified.append(email)
+                        statuses[email] = status
+                        print(f"✅ VERIFIED ({status}): {email}")
+                    return (business_data, verified, statuses)
                 else:
                     print(f"❌ No emails found on {business_data['website'][:50]}")
-                return (business_data, [])
+                return (business_data, [], {})
             
             # Process websites in parallel
-            with ThreadPoolExecutor(max_workers=5) as executor:
+            executor = ThreadPoolExecutor(max_workers=5)
+            try:
                 futures = [executor.submit(extract_and_verify, biz) for biz in batch_with_websites]
                 
                 for future in as_completed(futures):
                     if len(results_with_emails) >= limit:
                         break
                     
-                    with stop_lock:
-                        if stop_scraping:
-                            break
+                    if is_stop_requested(job_id):
+                        break
                     
                     try:
-                        business_data, verified_emails = future.result()
+                        business_data, verified_emails, email_status = future.result()
                         
                         # If this business has verified emails, add it as ONE result with ALL emails
                         if verified_emails:
@@ -496,7 +799,8 @@ def scrape_google_maps(query, limit=10):
                                 "address": business_data['address'],
                                 "phone": business_data['phone'],
                                 "website": business_data['website'],
-                                "emails": verified_emails  # All emails from this domain
+                                "emails": verified_emails,  # All emails from this domain
+                                "email_status": email_status
                             }
                             
                             result_hash = hashlib.md5(business_data['business_id'].encode()).hexdigest()
@@ -505,21 +809,23 @@ def scrape_google_maps(query, limit=10):
                                 results_with_emails.append(result)
                                 mark_business_as_shown(business_data['business_id'], query)
                                 
-                                with current_results_lock:
-                                    current_results.append(result)
-                                
-                                with progress_lock:
-                                    progress_data["current"] = len(results_with_emails)
-                                    progress_data["status"] = f"✓ {len(results_with_emails)}/{limit} businesses with verified emails"
+                                add_result(job_id, result)
+                                update_progress(
+                                    job_id,
+                                    current=len(results_with_emails),
+                                    status=f"✓ {len(results_with_emails)}/{limit} businesses with verified emails"
+                                )
                     except Exception as e:
                         print(f"Error in email extraction: {e}")
+            finally:
+                # On stop, limit reached or shutdown, drop queued fetches instead of waiting for them
+                executor.shutdown(wait=False, cancel_futures=True)
             
             # If we got enough results, stop
             if len(results_with_emails) >= limit:
                 break
             
-            with progress_lock:
-                progress_data["status"] = f"Found {len(results_with_emails)}/{limit}, getting next batch..."
+            update_progress(job_id, status=f"Found {len(results_with_emails)}/{limit}, getting next batch...")
     
     finally:
         driver.quit()
@@ -532,44 +838,102 @@ def scrape_google_maps(query, limit=10):
     
     # Save results
     if clean_results:
-        with progress_lock:
-            progress_data["status"] = "Saving to Excel..."
+        update_progress(job_id, status="Saving to Excel...")
         try:
             excel_file = save_to_excel(query, clean_results)
-            with progress_lock:
-                progress_data["status"] = f"✓ Complete! Saved {len(clean_results)} results to {os.path.basename(excel_file)}"
+            update_progress(job_id, status=f"✓ Complete! Saved {len(clean_results)} results to {os.path.basename(excel_file)}")
         except Exception as e:
-            with progress_lock:
-                progress_data["status"] = f"✓ Complete! Found {len(clean_results)} results"
+            update_progress(job_id, status=f"✓ Complete! Found {len(clean_results)} results")
     else:
-        with progress_lock:
-            progress_data["status"] = f"✓ Complete! Found {len(clean_results)} verified results"
+        update_progress(job_id, status=f"✓ Complete! Found {len(clean_results)} verified results")
     
     return clean_results
 
-# Global variable to store current results
-current_results = []
-current_results_lock = threading.Lock()
+# (job_id, process) for scrapes started by this web worker
+scrape_processes = []
+scrape_processes_lock = threading.Lock()
+
+def stop_on_sigterm(signum, frame):
+    """Turn SIGTERM into SystemExit so the scraper's cleanup (driver.quit) runs"""
+    sys.exit(1)
+
+def run_scrape_job(job_id, query, limit, verify_mx):
+    """Run a scrape as a standalone job, recording failures in the job store"""
+    if threading.current_thread() is threading.main_thread():
+        # Running as a worker process
+        signal.signal(signal.SIGTERM, stop_on_sigterm)
+        set_job_pid(job_id, os.getpid())
+    terminated = False
+    try:
+        scrape_google_maps(job_id, query, limit, verify_mx)
+    except SystemExit:
+        terminated = True
+        update_progress(job_id, status="Stopped: server shutting down")
+    except Exception as e:
+        print(f"Scrape job failed: {e}")
+        update_progress(job_id, status=f"Stopped: {e}")
+    finally:
+        finish_job(job_id)
+
+    if terminated and threading.current_thread() is threading.main_thread():
+        # Chrome is already closed; exit now rather than wait at interpreter exit
+        # for in-flight website fetches
+        sys.stdout.flush()
+        os._exit(1)
+
+def start_scrape_process(job_id, query, limit, verify_mx):
+    """Run a scrape in its own process so it never competes with web requests"""
+    with scrape_processes_lock:
+        # Reap finished jobs
+        scrape_processes[:] = [(j, p) for j, p in scrape_processes if p.is_alive()]
+        # Daemon, so a worker exiting terminates its scrapes instead of waiting on them
+        process = multiprocessing.get_context("spawn").Process(
+            target=run_scrape_job, args=(job_id, query, limit, verify_mx), daemon=True
+        )
+        process.start()
+        scrape_processes.append((job_id, process))
+    set_job_pid(job_id, process.pid)
+
+def stop_scrape_processes(timeout=10):
+    """Terminate this worker's scrape processes, giving each time to close Chrome"""
+    with scrape_processes_lock:
+        for job_id, process in scrape_processes:
+            if process.is_alive():
+                # Ask the scraper loops to stop as well, in case SIGTERM lands outside them
+                request_stop(job_id)
+                process.terminate()
+        for job_id, process in scrape_processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+        scrape_processes.clear()
+
+def get_job_id():
+    """Read the job id from the query string, form or JSON body"""
+    job_id = request.values.get("job_id")
+    if job_id is None and request.is_json:
+        job_id = (request.get_json(silent=True) or {}).get("job_id")
+    return job_id
 
 @app.route("/progress")
 def get_progress():
-    """Return current progress as JSON"""
-    with progress_lock:
-        return jsonify(progress_data)
+    """Return a job's progress as JSON"""
+    progress = read_progress(get_job_id())
+    if progress is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(progress)
 
 @app.route("/stop", methods=["POST"])
 def stop_search():
-    """Stop the current search"""
-    global stop_scraping
-    with stop_lock:
-        stop_scraping = True
+    """Stop a running search"""
+    if not request_stop(get_job_id()):
+        return jsonify({"error": "Unknown job"}), 404
     return jsonify({"status": "stopping"})
 
 @app.route("/results")
 def get_results():
-    """Return current results as JSON"""
-    with current_results_lock:
-        return jsonify(current_results)
+    """Return a job's results as JSON"""
+    return jsonify(read_results(get_job_id()))
 
 @app.route("/excel_files")
 def list_excel_files():
@@ -599,6 +963,271 @@ def download_file(filename):
         return send_file(filepath, as_attachment=True)
     return "File not found", 404
 
+# LRU cache of export filename -> row index, refreshed in the background when the file's mtime changes
+export_indexes = OrderedDict()
+export_index_builds = {}  # filename -> Future of the running (re)build
+export_index_errors = {}  # filename -> (mtime, error) of the last failed build
+export_indexes_lock = threading.Lock()
+export_index_executor = ThreadPoolExecutor(max_workers=2)
+EXPORT_INDEX_DIR = "exports/.index"
+EXPORT_INDEX_CACHE_SIZE = 3  # Indexes kept in memory per process
+EXPORT_PAGE_MAX = 500
+EXPORT_QUERY_CACHE_SIZE = 32
+
+def export_sort_key(value):
+    """Sort key that orders numbers numerically, text case-insensitively, blanks last"""
+    if value is None:
+        return (2, 0)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    return (1, str(value).lower())
+
+def normalize_export_value(value):
+    """Convert a cell value to a JSON-native type so fresh and reloaded indexes match"""
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+def export_search_key(record):
+    """Build the lowercase full-text key for a row: name, emails and website/email domains"""
+    emails = str(record.get("emails") or "")
+    domains = [e.split("@")[1] for e in re.split(r"[,\s]+", emails) if "@" in e]
+    website = record.get("website")
+    if website and website != "N/A":
+        domains.append(urlparse(str(website)).hostname or "")
+    return " ".join([str(record.get("name") or ""), emails] + domains).lower()
+
+def read_export_rows(filepath, base=None):
+    """Read an export's rows and search keys.
+
+    If base (a previous index of the same file) still matches the file's header and
+    last indexed row, only the rows appended since then are read.
+    """
+    wb = load_workbook(filepath, read_only=True)
+    try:
+        ws = wb.active
+        header = next(ws.iter_rows(max_row=1, values_only=True), ())
+        # "Date Added" -> "date_added"
+        columns = [str(h).strip().lower().replace(" ", "_") if h else f"col_{i + 1}" for i, h in enumerate(header)]
+
+        rows = []
+        search_keys = []
+        last_row = 1
+        start_row = 2
+        appending = bool(base and base.get("last_row") and base["rows"] and base["columns"] == columns)
+        if appending:
+            # Re-read the last indexed row to confirm the file was only appended to
+            last_row = base["last_row"]
+            start_row = last_row
+
+        verified = False
+        for row_num, values in enumerate(ws.iter_rows(min_row=start_row, values_only=True), start_row):
+            row = [normalize_export_value(v) for v in values[:len(columns)]]
+            row += [None] * (len(columns) - len(row))
+            if appending and row_num == start_row:
+                verified = row == base["rows"][-1]
+                if not verified:
+                    break
+                continue
+            if row[0] is None:  # Skip empty rows
+                continue
+            rows.append(row)
+            search_keys.append(export_search_key(dict(zip(columns, row))))
+            last_row = row_num
+    finally:
+        wb.close()
+
+    if not appending:
+        return columns, rows, search_keys, last_row
+    if verified:
+        return columns, base["rows"] + rows, base["search_keys"] + search_keys, last_row
+    # The file was rewritten rather than appended to
+    return read_export_rows(filepath)
+
+def load_export_sidecar(filename):
+    """Load the saved index for an export, if any"""
+    index_path = os.path.join(EXPORT_INDEX_DIR, filename + ".json")
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def build_export_index(filename, mtime, previous=None):
+    """Build an export's index, reusing its sidecar file or a previous index where possible"""
+    data = load_export_sidecar(filename)
+    if data is None or data.get("mtime") != mtime:
+        base = previous if previous is not None else data
+        columns, rows, search_keys, last_row = read_export_rows(os.path.join("exports", filename), base)
+        data = {"mtime": mtime, "columns": columns, "rows": rows, "search_keys": search_keys, "last_row": last_row}
+        # Write atomically so other workers never read a partial index
+        os.makedirs(EXPORT_INDEX_DIR, exist_ok=True)
+        index_path = os.path.join(EXPORT_INDEX_DIR, filename + ".json")
+        tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, index_path)
+
+    # One newline-joined blob lets str.find scan every row at C speed
+    search_starts = []
+    offset = 0
+    for key in data["search_keys"]:
+        search_starts.append(offset)
+        offset += len(key) + 1
+    data["search_blob"] = "\n".join(data["search_keys"])
+    data["search_starts"] = search_starts
+    data["ranks"] = {}  # column -> rank of each row in ascending order
+    data["queries"] = OrderedDict()  # (q, sort, order) -> matching row positions
+    return data
+
+def refresh_export_index(filename, mtime, previous):
+    """Background task: (re)build an export's index and publish it"""
+    try:
+        index = build_export_index(filename, mtime, previous)
+    except Exception as e:
+        print(f"Error indexing {filename}: {e}")
+        with export_indexes_lock:
+            export_index_errors[filename] = (mtime, str(e))
+        return
+    with export_indexes_lock:
+        export_indexes[filename] = index
+        export_indexes.move_to_end(filename)
+        export_index_errors.pop(filename, None)
+        # Drop indexes of deleted exports, then the least recently used ones
+        for name in [n for n in export_indexes if not os.path.exists(os.path.join("exports", n))]:
+            del export_indexes[name]
+        while len(export_indexes) > EXPORT_INDEX_CACHE_SIZE:
+            export_indexes.popitem(last=False)
+
+def forget_export_index(filename):
+    """Drop everything cached for an export (e.g. after it was deleted)"""
+    with export_indexes_lock:
+        export_indexes.pop(filename, None)
+        export_index_builds.pop(filename, None)
+        export_index_errors.pop(filename, None)
+
+def get_export_index(filename):
+    """Return (index, up_to_date) for an export, starting a background refresh if it changed.
+
+    Returns (None, False) while the first build is still running. Raises RuntimeError
+    if the last build of the current file version failed.
+    """
+    mtime = os.stat(os.path.join("exports", filename)).st_mtime
+    with export_indexes_lock:
+        index = export_indexes.get(filename)
+        if index is not None and index["mtime"] == mtime:
+            export_indexes.move_to_end(filename)
+            return index, True
+        error = export_index_errors.get(filename)
+        if error is not None and error[0] == mtime:
+            raise RuntimeError(error[1])
+        # Only one build per file at a time; concurrent requests share it
+        build = export_index_builds.get(filename)
+        if build is None or build.done():
+            export_index_builds[filename] = export_index_executor.submit(refresh_export_index, filename, mtime, index)
+    return index, False
+
+def find_export_matches(index, terms):
+    """Return positions of rows whose search key contains every term"""
+    blob = index["search_blob"]
+    starts = index["search_starts"]
+    search_keys = index["search_keys"]
+    # Drive the scan with the rarest term
+    counts = {t: blob.count(t) for t in terms}
+    terms = sorted(terms, key=counts.get)
+
+    # Broad terms match most rows; checking each key is cheaper than locating every hit
+    if counts[terms[0]] > len(starts) // 8:
+        return [i for i, key in enumerate(search_keys) if all(t in key for t in terms)]
+
+    matches = []
+    pos = blob.find(terms[0])
+    while pos != -1:
+        row = bisect_right(starts, pos) - 1
+        matches.append(row)
+        if row + 1 >= len(starts):
+            break
+        pos = blob.find(terms[0], starts[row + 1])
+
+    for term in terms[1:]:
+        matches = [i for i in matches if term in search_keys[i]]
+    return matches
+
+def query_export_index(index, q, sort, order):
+    """Return row positions matching q, sorted by the given column (cached per query)"""
+    cache_key = (q, sort, order)
+    with export_indexes_lock:
+        if cache_key in index["queries"]:
+            index["queries"].move_to_end(cache_key)
+            return index["queries"][cache_key]
+
+    terms = q.lower().split()
+    positions = find_export_matches(index, terms) if terms else list(range(len(index["rows"])))
+
+    if sort:
+        with export_indexes_lock:
+            ranks = index["ranks"].get(sort)
+        if ranks is None:
+            col = index["columns"].index(sort)
+            rows = index["rows"]
+            ranks = [0] * len(rows)
+            for rank, i in enumerate(sorted(range(len(rows)), key=lambda i: export_sort_key(rows[i][col]))):
+                ranks[i] = rank
+            with export_indexes_lock:
+                index["ranks"][sort] = ranks
+        positions.sort(key=ranks.__getitem__)
+
+    if order == "desc":
+        positions.reverse()
+
+    with export_indexes_lock:
+        index["queries"][cache_key] = positions
+        if len(index["queries"]) > EXPORT_QUERY_CACHE_SIZE:
+            index["queries"].popitem(last=False)
+    return positions
+
+@app.route("/exports/<name>/rows")
+def get_export_rows(name):
+    """Return a page of rows from an export, with optional filter and sorting"""
+    if os.path.basename(name) != name or not name.endswith(".xlsx"):
+        return jsonify({"error": "File not found"}), 404
+    if not os.path.exists(os.path.join("exports", name)):
+        forget_export_index(name)
+        return jsonify({"error": "File not found"}), 404
+
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", 50, type=int), 1), EXPORT_PAGE_MAX)
+    q = request.args.get("q", "").strip()
+    sort = request.args.get("sort", "")
+    order = "desc" if request.args.get("order", "asc") == "desc" else "asc"
+
+    try:
+        index, up_to_date = get_export_index(name)
+    except Exception as e:
+        print(f"Error indexing {name}: {e}")
+        return jsonify({"error": f"Could not read {name}"}), 500
+
+    if index is None:
+        return jsonify({"name": name, "status": "indexing"}), 202
+
+    if sort and sort not in index["columns"]:
+        return jsonify({"error": f"Unknown sort column: {sort}"}), 400
+
+    positions = query_export_index(index, q, sort, order)
+    rows = index["rows"]
+    return jsonify({
+        "name": name,
+        "status": "ready" if up_to_date else "indexing",  # "indexing": served from the previous version
+        "columns": index["columns"],
+        "total": len(rows),
+        "matched": len(positions),
+        "offset": offset,
+        "limit": limit,
+        "rows": [dict(zip(index["columns"], rows[i])) for i in positions[offset:offset + limit]]
+    })
+
 @app.route("/view_excel")
 def view_excel():
     """View all Excel files in a separate page"""
@@ -622,7 +1251,7 @@ def create_combined_excel():
     combined_ws.title = "All Data"
     
     # Create header row with styling
-    headers = ["Sr No", "Name", "Address", "Phone", "Website", "Emails", "Exporter Type", "Date Added"]
+    headers = ["Sr No", "Name", "Address", "Phone", "Website", "Emails", "Exporter Type", "Date Added", "Email Status"]
     header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
     header_font = Font(bold=True, color="FFFFFF", size=12)
     
@@ -641,6 +1270,7 @@ def create_combined_excel():
     combined_ws.column_dimensions['F'].width = 40
     combined_ws.column_dimensions['G'].width = 30
     combined_ws.column_dimensions['H'].width = 20
+    combined_ws.column_dimensions['I'].width = 30
     
     current_row = 2
     sr_no = 1
@@ -653,7 +1283,7 @@ def create_combined_excel():
         exporter_type = excel_file.replace(".xlsx", "").replace("_", " ").title()
         
         try:
-            wb = load_workbook(filepath)
+            wb = load_workbook(filepath, read_only=True)
             ws = wb.active
             
             # Skip header row and read data
@@ -670,9 +1300,10 @@ def create_combined_excel():
                 combined_ws.cell(current_row, 6, row[5] if len(row) > 5 else "N/A")  # Emails
                 combined_ws.cell(current_row, 7, exporter_type)  # Exporter Type
                 combined_ws.cell(current_row, 8, row[6] if len(row) > 6 else datetime.now().strftime("%Y-%m-%d %H:%M:%S"))  # Date
+                combined_ws.cell(current_row, 9, row[7] if len(row) > 7 and row[7] is not None else "N/A")  # Email Status
                 
                 # Apply alignment
-                for col in range(1, 9):
+                for col in range(1, 10):
                     combined_ws.cell(current_row, col).alignment = Alignment(vertical="top", wrap_text=True)
                 
                 sr_no += 1
@@ -685,7 +1316,7 @@ def create_combined_excel():
     
     # Save combined Excel file
     combined_filepath = os.path.join("exports", "combined_all_data.xlsx")
-    combined_wb.save(combined_filepath)
+    save_workbook_atomic(combined_wb, combined_filepath)
     
     return jsonify({
         "success": True, 
@@ -695,30 +1326,30 @@ def create_combined_excel():
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    global current_results
-    
     if request.method == "POST":
         query = request.form["query"]
         limit = int(request.form.get("limit", 10))
+        verify_mx = request.form.get("verify_mx") == "on"
         
-        # Clear previous results
-        with current_results_lock:
-            current_results = []
-        
-        # Start scraping in background thread
-        def scrape_in_background():
-            results = scrape_google_maps(query, limit)
-            with current_results_lock:
-                current_results.extend(results)
+        job_id = create_job(limit)
+        if job_id is None:
+            return jsonify({"error": f"Too many searches running (max {MAX_SCRAPE_JOBS}), please try again shortly"}), 429
         
-        thread = threading.Thread(target=scrape_in_background)
-        thread.daemon = True
-        thread.start()
+        if JOB_RUNNER == "process":
+            start_scrape_process(job_id, query, limit, verify_mx)
+        else:
+            # Start scraping in background thread
+            thread = threading.Thread(target=run_scrape_job, args=(job_id, query, limit, verify_mx))
+            thread.daemon = True
+            thread.start()
         
-        return render_template("index.html", streaming=True)
+        if request.accept_mimetypes.best == "application/json":
+            return jsonify({"job_id": job_id})
+        return render_template("index.html", streaming=True, job_id=job_id)
 
     return render_template("index.html", streaming=False)
 
 if __name__ == "__main__":
+    # Development server only; use wsgi.py (gunicorn -c gunicorn.conf.py wsgi:app) in production
     # Use threaded=False to prevent Flask from creating too many threads
     app.run(host="0.0.0.0", port=8580, debug=True, threaded=False)
@@ -0,0 +1,209 @@
+import os
+from datetime import datetime
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+import main
+
+HEADER = ["Sr No", "Name", "Address", "Phone", "Website", "Emails", "Date Added"]
+
+
+def make_row(i, name=None):
+    return [i, name or f"Biz {i}", f"Addr {i}", "123", f"https://www.site{i}.com/", f"info@site{i}.com", "2024-01-01 00:00:00"]
+
+
+def write_export(name, rows, header=HEADER):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    path = os.path.join("exports", name)
+    wb.save(path)
+    bump_mtime(path)
+    return path
+
+
+def append_rows(name, rows):
+    path = os.path.join("exports", name)
+    wb = load_workbook(path)
+    for row in rows:
+        wb.active.append(row)
+    wb.save(path)
+    bump_mtime(path)
+
+
+def bump_mtime(path):
+    # Make every write visible even on filesystems with coarse mtimes
+    bump_mtime.counter += 10
+    os.utime(path, (bump_mtime.counter, bump_mtime.counter))
+
+
+bump_mtime.counter = 1_000_000
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("exports")
+    monkeypatch.setattr(main, "export_indexes", main.OrderedDict())
+    monkeypatch.setattr(main, "export_index_builds", {})
+    monkeypatch.setattr(main, "export_index_errors", {})
+    return main.app.test_client()
+
+
+def get_rows(client, name, **params):
+    """Request rows, waiting for any background index build to finish"""
+    url = f"/exports/{name}/rows"
+    for _ in range(3):
+        response = client.get(url, query_string=params)
+        if response.status_code not in (200, 202) or response.get_json()["status"] == "ready":
+            return response
+        main.export_index_builds[name].result()
+    return response
+
+
+def names(response):
+    return [row["name"] for row in response.get_json()["rows"]]
+
+
+def test_first_request_returns_202_while_indexing(client):
+    write_export("a.xlsx", [make_row(1)])
+    response = client.get("/exports/a.xlsx/rows")
+    assert response.status_code == 202
+    assert response.get_json()["status"] == "indexing"
+
+    main.export_index_builds["a.xlsx"].result()
+    response = client.get("/exports/a.xlsx/rows")
+    assert response.status_code == 200
+    assert response.get_json()["rows"][0] == {
+        "sr_no": 1, "name": "Biz 1", "address": "Addr 1", "phone": "123",
+        "website": "https://www.site1.com/", "emails": "info@site1.com", "date_added": "2024-01-01 00:00:00",
+    }
+
+
+def test_pagination_filter_and_sort(client):
+    write_export("a.xlsx", [make_row(i) for i in range(1, 31)] + [[31, None, "x", "1", "N/A", "N/A", "2024"]])
+
+    data = get_rows(client, "a.xlsx", offset=10, limit=5).get_json()
+    assert (data["total"], data["matched"], data["offset"]) == (31, 31, 10)
+    assert [row["sr_no"] for row in data["rows"]] == [11, 12, 13, 14, 15]
+
+    assert names(get_rows(client, "a.xlsx", q="site12.com")) == ["Biz 12"]
+    assert names(get_rows(client, "a.xlsx", q="SITE2 biz")) == ["Biz 2"] + [f"Biz {i}" for i in range(20, 30)]
+
+    # Numbers sort numerically, blanks last (first when descending)
+    assert [r["sr_no"] for r in get_rows(client, "a.xlsx", sort="sr_no", order="desc", limit=3).get_json()["rows"]] == [31, 30, 29]
+    assert names(get_rows(client, "a.xlsx", sort="name", limit=3)) == ["Biz 1", "Biz 10", "Biz 11"]
+    assert names(get_rows(client, "a.xlsx", sort="name", order="desc", limit=2)) == [None, "Biz 9"]
+
+
+def test_unknown_sort_column_and_missing_file(client):
+    write_export("a.xlsx", [make_row(1)])
+    assert get_rows(client, "a.xlsx", sort="bogus").status_code == 400
+    assert client.get("/exports/missing.xlsx/rows").status_code == 404
+    assert client.get("/exports/a.txt/rows").status_code == 404
+
+    os.remove("exports/a.xlsx")
+    assert client.get("/exports/a.xlsx/rows").status_code == 404
+    assert "a.xlsx" not in main.export_indexes
+
+
+def test_appended_rows_are_read_incrementally(client):
+    path = write_export("a.xlsx", [make_row(i) for i in range(1, 4)])
+    base = main.build_export_index("a.xlsx", os.stat(path).st_mtime)
+
+    append_rows("a.xlsx", [make_row(4), make_row(5)])
+    columns, rows, search_keys, last_row = main.read_export_rows(path, base)
+    assert all(new is old for new, old in zip(rows, base["rows"]))  # Earlier rows reused, not re-read
+    assert [row[1] for row in rows] == ["Biz 1", "Biz 2", "Biz 3", "Biz 4", "Biz 5"]
+    assert len(search_keys) == 5 and last_row == 6
+
+    # Through the endpoint: the stale index is served while the refresh runs
+    assert names(get_rows(client, "a.xlsx")) == ["Biz 1", "Biz 2", "Biz 3", "Biz 4", "Biz 5"]
+    append_rows("a.xlsx", [make_row(6)])
+    assert client.get("/exports/a.xlsx/rows").get_json()["status"] == "indexing"
+    assert names(get_rows(client, "a.xlsx", sort="sr_no", order="desc", limit=1)) == ["Biz 6"]
+
+
+def test_rewritten_file_is_fully_reread(client):
+    path = write_export("a.xlsx", [make_row(i) for i in range(1, 4)])
+    base = main.build_export_index("a.xlsx", os.stat(path).st_mtime)
+
+    write_export("a.xlsx", [make_row(1, "New 1"), make_row(2, "New 2"), make_row(3, "New 3"), make_row(4, "New 4")])
+    columns, rows, _, _ = main.read_export_rows(path, base)
+    assert [row[1] for row in rows] == ["New 1", "New 2", "New 3", "New 4"]
+
+    # The file shrank below the last indexed row
+    write_export("a.xlsx", [make_row(1, "Only")])
+    assert [row[1] for row in main.read_export_rows(path, base)[1]] == ["Only"]
+
+
+def test_changed_header_is_fully_reread(client):
+    path = write_export("a.xlsx", [make_row(1)])
+    base = main.build_export_index("a.xlsx", os.stat(path).st_mtime)
+
+    wb = load_workbook(path)
+    wb.active.cell(1, 8, "Email Status")
+    wb.active.append(make_row(2) + ["mx"])
+    wb.save(path)
+    bump_mtime(path)
+
+    columns, rows, _, _ = main.read_export_rows(path, base)
+    assert columns[-1] == "email_status"
+    assert rows == [make_row(1) + [None], make_row(2) + ["mx"]]
+    assert not any(new is old for new, old in zip(rows, base["rows"]))
+
+
+def test_values_match_between_fresh_and_sidecar_indexes(client, monkeypatch):
+    path = write_export("a.xlsx", [[1, "Dated", "x", 42, "N/A", "N/A", datetime(2024, 5, 6, 7, 8, 9)]])
+    mtime = os.stat(path).st_mtime
+    fresh = main.build_export_index("a.xlsx", mtime)
+    assert fresh["rows"][0][-1] == "2024-05-06 07:08:09"
+    assert fresh["rows"][0][3] == 42
+
+    # Same mtime: the sidecar is used and the xlsx is not read again
+    def fail(*args, **kwargs):
+        raise AssertionError("xlsx should not be re-read")
+    monkeypatch.setattr(main, "read_export_rows", fail)
+    reloaded = main.build_export_index("a.xlsx", mtime)
+    assert reloaded["rows"] == fresh["rows"]
+
+
+def test_failed_build_returns_500_until_file_changes(client, monkeypatch):
+    write_export("a.xlsx", [make_row(1)])
+    read_export_rows = main.read_export_rows
+
+    def corrupt(*args, **kwargs):
+        raise ValueError("corrupt")
+    monkeypatch.setattr(main, "read_export_rows", corrupt)
+    client.get("/exports/a.xlsx/rows")
+    main.export_index_builds["a.xlsx"].result()
+    assert client.get("/exports/a.xlsx/rows").status_code == 500
+
+    monkeypatch.setattr(main, "read_export_rows", read_export_rows)
+    bump_mtime("exports/a.xlsx")
+    assert names(get_rows(client, "a.xlsx")) == ["Biz 1"]
+
+
+def test_index_cache_is_bounded(client, monkeypatch):
+    monkeypatch.setattr(main, "EXPORT_INDEX_CACHE_SIZE", 2)
+    for name in ["a.xlsx", "b.xlsx", "c.xlsx"]:
+        write_export(name, [make_row(1)])
+        get_rows(client, name)
+    assert list(main.export_indexes) == ["b.xlsx", "c.xlsx"]
+
+
+def test_find_export_matches_agrees_with_brute_force(client):
+    # "com" and "site7" are common enough to take the broad-term path; "info@site19" and
+    # "site200.com" take the find() scan path
+    rows = [make_row(i) for i in range(1, 201)]
+    path = write_export("a.xlsx", rows)
+    index = main.build_export_index("a.xlsx", os.stat(path).st_mtime)
+    keys = index["search_keys"]
+
+    for q in ["com", "site7", "site7 biz", "info@site19", "biz 1 addr", "nomatch", "site200.com"]:
+        terms = q.lower().split()
+        expected = [i for i, key in enumerate(keys) if all(t in key for t in terms)]
+        assert sorted(main.find_export_matches(index, terms)) == expected, q
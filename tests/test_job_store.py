@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+
+import pytest
+from openpyxl import load_workbook
+
+import main
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "jobs_db_ready", False)
+    monkeypatch.setattr(main, "MAX_SCRAPE_JOBS", 2)
+
+
+def test_jobs_are_isolated(job_store):
+    job_a = main.create_job(10)
+    job_b = main.create_job(5)
+
+    main.update_progress(job_a, current=3, status="A running")
+    main.add_result(job_a, {"name": "A"})
+    main.add_result(job_b, {"name": "B"})
+    assert main.request_stop(job_b)
+
+    assert main.read_progress(job_a) == {"current": 3, "total": 10, "status": "A running"}
+    assert main.read_progress(job_b)["total"] == 5
+    assert main.read_results(job_a) == [{"name": "A"}]
+    assert main.read_results(job_b) == [{"name": "B"}]
+    assert not main.is_stop_requested(job_a)
+    assert main.is_stop_requested(job_b)
+
+
+def test_running_jobs_are_capped(job_store):
+    job_a = main.create_job(10)
+    assert main.create_job(10) is not None
+    assert main.create_job(10) is None
+
+    main.finish_job(job_a)
+    assert main.create_job(10) is not None
+
+
+def test_jobs_with_dead_processes_do_not_count(job_store, monkeypatch):
+    job_a = main.create_job(10)
+    main.create_job(10)
+    main.set_job_pid(job_a, 123456)
+    monkeypatch.setattr(main, "is_process_alive", lambda pid: pid != 123456)
+    assert main.create_job(10) is not None
+
+
+def test_shown_businesses_are_imported_from_json_db(job_store):
+    with open(main.DB_FILE, "w") as f:
+        json.dump({"shown_rice": ["A|1"]}, f)
+
+    assert main.is_business_already_shown("A|1", "rice")
+    assert not main.is_business_already_shown("B|2", "rice")
+    main.mark_business_as_shown("B|2", "rice")
+    main.mark_business_as_shown("B|2", "rice")
+    assert main.is_business_already_shown("B|2", "rice")
+    assert not main.is_business_already_shown("B|2", "wheat")
+
+
+def test_concurrent_saves_to_one_export_keep_all_rows(job_store):
+    batches = [
+        [{"name": f"Biz {t}-{i}", "address": "x", "phone": "1", "website": None, "emails": []} for i in range(5)]
+        for t in range(4)
+    ]
+    threads = [threading.Thread(target=main.save_to_excel, args=("rice", batch)) for batch in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ws = load_workbook(main.get_excel_filename("rice")).active
+    names = [row[1] for row in ws.iter_rows(min_row=2, values_only=True)]
+    assert sorted(names) == sorted(r["name"] for batch in batches for r in batch)
+    assert not [f for f in os.listdir("exports") if f.endswith(".tmp")]
+
+
+def test_stop_scrape_processes_requests_stop_first(job_store, monkeypatch):
+    job_id = main.create_job(10)
+
+    class FakeProcess:
+        stopped_before_terminate = None
+
+        def is_alive(self):
+            return True
+
+        def terminate(self):
+            self.stopped_before_terminate = main.is_stop_requested(job_id)
+
+        def join(self, timeout):
+            pass
+
+        def kill(self):
+            pass
+
+    process = FakeProcess()
+    monkeypatch.setattr(main, "scrape_processes", [(job_id, process)])
+    main.stop_scrape_processes()
+    assert process.stopped_before_terminate
+    assert main.scrape_processes == []
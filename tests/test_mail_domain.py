@@ -0,0 +1,96 @@
+import socket
+import threading
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+import pytest
+
+import main
+
+# name -> {rdtype: [records]}; names missing from the table are NXDOMAIN
+ZONE = {
+    "mx.test.": {"MX": ["10 mail.mx.test."]},
+    "nullmx.test.": {"MX": ["0 ."]},
+    "aonly.test.": {"A": ["192.0.2.1"]},
+    "v6only.test.": {"AAAA": ["2001:db8::1"]},
+    "nomail.test.": {},
+}
+SERVFAIL = {"broken.test."}
+
+
+def serve(sock):
+    while True:
+        try:
+            data, addr = sock.recvfrom(4096)
+            sock.sendto(answer(data).to_wire(), addr)
+        except OSError:  # Socket closed by the fixture
+            return
+
+
+def answer(data):
+    query = dns.message.from_wire(data)
+    question = query.question[0]
+    name = question.name.to_text()
+    rdtype = dns.rdatatype.to_text(question.rdtype)
+    response = dns.message.make_response(query)
+    if name in SERVFAIL:
+        response.set_rcode(dns.rcode.SERVFAIL)
+    elif name not in ZONE:
+        response.set_rcode(dns.rcode.NXDOMAIN)
+    elif rdtype in ZONE[name]:
+        response.answer.append(dns.rrset.from_text_list(name, 60, "IN", rdtype, ZONE[name][rdtype]))
+    return response
+
+
+@pytest.fixture
+def stub_resolver(monkeypatch):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    threading.Thread(target=serve, args=(sock,), daemon=True).start()
+    monkeypatch.setattr(main, "DNS_NAMESERVER", ("127.0.0.1", sock.getsockname()[1]))
+    monkeypatch.setattr(main, "DNS_TIMEOUT", 0.5)
+    monkeypatch.setattr(main, "dns_resolver", None)
+    yield
+    sock.close()
+
+
+@pytest.mark.parametrize("domain, status", [
+    ("mx.test", "mx"),
+    ("nullmx.test", "no_mail"),
+    ("missing.test", "no_mail"),
+    ("aonly.test", "a_only"),
+    ("v6only.test", "a_only"),
+    ("nomail.test", "no_mail"),
+    ("broken.test", "unknown"),
+])
+def test_lookup_mail_domain(stub_resolver, domain, status):
+    assert main.lookup_mail_domain(domain) == status
+
+
+def test_unknown_results_are_not_cached(stub_resolver, monkeypatch):
+    monkeypatch.setattr(main, "dns_cache", main.OrderedDict())
+    first = main.prefetch_domain("broken.test")
+    assert first.result() == "unknown"
+    assert main.prefetch_domain("broken.test") is not first
+
+    ok = main.prefetch_domain("mx.test")
+    assert ok.result() == "mx"
+    assert main.prefetch_domain("mx.test") is ok
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("127.0.0.1", ("127.0.0.1", 53)),
+    ("127.0.0.1:5353", ("127.0.0.1", 5353)),
+    ("::1", ("::1", 53)),
+    ("[::1]:5353", ("::1", 5353)),
+])
+def test_parse_nameserver(value, expected):
+    assert main.parse_nameserver(value) == expected
+
+
+@pytest.mark.parametrize("value", ["localhost:5353", "127.0.0.1:dns", "[::1", "127.0.0.1:0"])
+def test_parse_nameserver_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        main.parse_nameserver(value)
@@ -0,0 +1,12 @@
+"""Production WSGI entry point.
+
+Run with: gunicorn -c gunicorn.conf.py wsgi:app
+
+Each scrape runs in its own worker process and reports progress and results
+through the shared job store (jobs.db), so web workers stay responsive.
+"""
+import os
+
+os.environ.setdefault("JOB_RUNNER", "process")
+
+from main import app